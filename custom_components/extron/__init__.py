@@ -10,8 +10,16 @@ from homeassistant.core import DOMAIN, HomeAssistant
 from homeassistant.exceptions import ConfigEntryNotReady
 from homeassistant.helpers.device_registry import DeviceInfo, format_mac
 
-from custom_components.extron.const import OPTION_INPUT_NAMES
-from custom_components.extron.extron import AuthenticationError, ExtronDevice
+from custom_components.extron.const import CONF_DEVICE_TYPE, OPTION_INPUT_NAMES
+from custom_components.extron.coordinator import ExtronDataUpdateCoordinator
+from custom_components.extron.extron import (
+    AuthenticationError,
+    DeviceType,
+    ExtronDevice,
+    ExtronDevicePool,
+    HDMISwitcher,
+    SurroundSoundProcessor,
+)
 
 PLATFORMS: list[Platform] = [Platform.MEDIA_PLAYER, Platform.SENSOR, Platform.BUTTON]
 _LOGGER = logging.getLogger(__name__)
@@ -25,7 +33,8 @@ class DeviceInformation:
 
 @dataclass
 class ExtronConfigEntryRuntimeData:
-    device: ExtronDevice
+    pool: ExtronDevicePool
+    coordinator: ExtronDataUpdateCoordinator
     device_information: DeviceInformation
     input_names: list[str]
 
@@ -50,18 +59,38 @@ async def get_device_information(device: ExtronDevice) -> DeviceInformation:
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Set up Extron from a config entry."""
     # Verify we can connect to the device
+    pool = ExtronDevicePool(entry.data["host"], entry.data["port"], entry.data["password"])
     try:
-        device = ExtronDevice(entry.data["host"], entry.data["port"], entry.data["password"])
-        await device.connect()
+        await pool.open()
     except AuthenticationError as e:
+        await pool.close()
         raise ConfigEntryNotReady("Invalid credentials") from e
     except Exception as e:
+        await pool.close()
         raise ConfigEntryNotReady("Unable to connect") from e
 
-    # Store runtime information
-    device_information = await get_device_information(device)
+    # Close the pool if setup fails from here on, otherwise every setup retry leaks a connection
+    try:
+        # Store runtime information
+        async with pool.acquire() as device:
+            device_information = await get_device_information(device)
+
+        # Poll the device through a single coordinator shared by all entities
+        if entry.data[CONF_DEVICE_TYPE] == DeviceType.SURROUND_SOUND_PROCESSOR.value:
+            coordinator = ExtronDataUpdateCoordinator(hass, SurroundSoundProcessor(pool))
+        else:
+            coordinator = ExtronDataUpdateCoordinator(hass, HDMISwitcher(pool))
+
+        await coordinator.async_config_entry_first_refresh()
+    except Exception:
+        await pool.close()
+        raise
+
     input_names = entry.options.get(OPTION_INPUT_NAMES, [])
-    entry.runtime_data = ExtronConfigEntryRuntimeData(device, device_information, input_names)
+    entry.runtime_data = ExtronConfigEntryRuntimeData(pool, coordinator, device_information, input_names)
+
+    # Only keep connections warm once the entry has been set up successfully
+    pool.start_heartbeat()
 
     # Register a listener for option updates
     entry.async_on_unload(entry.add_update_listener(entry_update_listener))
@@ -74,7 +103,12 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
 
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload a config entry."""
-    return await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
+    unload_ok = await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
+
+    if unload_ok:
+        await entry.runtime_data.pool.close()
+
+    return unload_ok
 
 
 async def entry_update_listener(hass: HomeAssistant, config_entry: ConfigEntry):
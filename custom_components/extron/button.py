@@ -2,9 +2,9 @@ import logging
 
 from homeassistant.components.button import ButtonDeviceClass, ButtonEntity
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.helpers.device_registry import DeviceInfo
 
-from custom_components.extron import DeviceInformation, ExtronConfigEntryRuntimeData, ExtronDevice
+from custom_components.extron import DeviceInformation, ExtronConfigEntryRuntimeData
+from custom_components.extron.extron import ExtronDevicePool
 
 logger = logging.getLogger(__name__)
 
@@ -12,34 +12,27 @@ logger = logging.getLogger(__name__)
 async def async_setup_entry(hass, entry: ConfigEntry, async_add_entities):
     # Extract stored runtime data from the entry
     runtime_data: ExtronConfigEntryRuntimeData = entry.runtime_data
-    device = runtime_data.device
+    pool = runtime_data.pool
     device_information = runtime_data.device_information
 
     # Add entities
-    async_add_entities([ExtronRebootButton(device, device_information)])
+    async_add_entities([ExtronRebootButton(pool, device_information)])
 
 
 class ExtronRebootButton(ButtonEntity):
-    def __init__(self, device: ExtronDevice, device_information: DeviceInformation) -> None:
-        self._device = device
+    def __init__(self, pool: ExtronDevicePool, device_information: DeviceInformation) -> None:
+        self._pool = pool
         self._device_information = device_information
 
-    _attr_device_class = ButtonDeviceClass.RESTART
-
-    @property
-    def unique_id(self) -> str | None:
-        return f"extron_{self._device_information.model_name}_reboot_button"
+        self._attr_unique_id = f"extron_{device_information.model_name}_reboot_button"
+        self._attr_name = f"Extron {device_information.model_name} reboot button"
+        self._attr_device_info = device_information.device_info
 
-    @property
-    def device_info(self) -> DeviceInfo:
-        return self._device_information.device_info
-
-    @property
-    def name(self):
-        return f"Extron {self._device_information.model_name} reboot button"
+    _attr_device_class = ButtonDeviceClass.RESTART
 
     async def async_press(self) -> None:
-        await self._device.reboot()
+        async with self._pool.acquire() as device:
+            await device.reboot()
 
-        # Disconnect immediately so we start attempting to reconnect immediately
-        await self._device.disconnect()
+            # Disconnect immediately so the pool opens a fresh connection on next use
+            await device.disconnect()
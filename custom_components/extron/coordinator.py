@@ -0,0 +1,37 @@
+"""Data update coordinator for the Extron integration."""
+
+import logging
+
+from datetime import timedelta
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
+
+from custom_components.extron.const import DOMAIN
+from custom_components.extron.extron import (
+    HDMISwitcher,
+    HDMISwitcherStatus,
+    ResponseError,
+    SurroundSoundProcessor,
+    SurroundSoundProcessorStatus,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+UPDATE_INTERVAL = timedelta(seconds=10)
+
+
+class ExtronDataUpdateCoordinator(DataUpdateCoordinator[SurroundSoundProcessorStatus | HDMISwitcherStatus]):
+    def __init__(self, hass: HomeAssistant, device: SurroundSoundProcessor | HDMISwitcher) -> None:
+        super().__init__(hass, _LOGGER, name=DOMAIN, update_interval=UPDATE_INTERVAL)
+        self._device = device
+
+    def get_device(self) -> SurroundSoundProcessor | HDMISwitcher:
+        return self._device
+
+    async def _async_update_data(self) -> SurroundSoundProcessorStatus | HDMISwitcherStatus:
+        # Poll the device once for all entities backed by it
+        try:
+            return await self._device.get_status()
+        except (RuntimeError, ResponseError, OSError, ValueError) as e:
+            raise UpdateFailed(f"Unable to update device status: {e}") from e
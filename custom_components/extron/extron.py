@@ -1,13 +1,27 @@
 import asyncio
 import logging
-import re
-
-from asyncio import StreamReader, StreamWriter, sleep
-from asyncio.exceptions import TimeoutError
+import random
+import socket
+
+from asyncio import sleep
+from collections import deque
+from collections.abc import AsyncIterator, Awaitable, Callable
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
 from enum import Enum
+from functools import lru_cache
 
 logger = logging.getLogger(__name__)
-error_regexp = re.compile("E[0-9]{2}")
+
+COMMAND_TIMEOUT = 3
+RETRIABLE_ERRORS = frozenset({b"E10"})
+RETRY_BASE_DELAY = 0.1
+RETRY_MAX_DELAY = 2.0
+RETRY_JITTER = 0.5
+KEEPALIVE_IDLE = 30
+KEEPALIVE_INTERVAL = 10
+KEEPALIVE_COUNT = 3
+HEARTBEAT_INTERVAL = 60
 
 
 class DeviceType(Enum):
@@ -24,8 +38,91 @@ class ResponseError(Exception):
     pass
 
 
-def is_error_response(response: str) -> bool:
-    return error_regexp.match(response) is not None
+def is_error_response(response: str | bytes) -> bool:
+    # Error responses are of the form "E" followed by two digits, e.g. "E10"
+    return len(response) >= 3 and response[:1] in ("E", b"E") and response[1:3].isdigit()
+
+
+def backoff_delay(attempt: int) -> float:
+    delay = min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * 2**attempt)
+    return delay * (1 + random.random() * RETRY_JITTER)
+
+
+@lru_cache(maxsize=64)
+def _encode_command(command: str) -> bytes:
+    return f"{command}\n".encode()
+
+
+class ExtronSisProtocol(asyncio.BufferedProtocol):
+    def __init__(self, on_connection_lost: Callable[["ExtronSisProtocol"], None] | None = None) -> None:
+        self._on_connection_lost = on_connection_lost
+        self._buf = bytearray(4096)
+        self._view = memoryview(self._buf)
+        self._pos = 0
+        self._eol = b"\r\n"
+        self._lines: deque[bytes] = deque()
+        self._line_waiter: asyncio.Future | None = None
+        self._transport: asyncio.Transport | None = None
+        self._closed = False
+
+    def connection_made(self, transport: asyncio.Transport) -> None:
+        self._transport = transport
+
+    def get_buffer(self, sizehint: int) -> memoryview:
+        return self._view[self._pos :]
+
+    def buffer_updated(self, nbytes: int) -> None:
+        self._pos += nbytes
+        start = 0
+
+        while (end := self._buf.find(self._eol, start, self._pos)) != -1:
+            self._lines.append(bytes(self._view[start:end]))
+            start = end + len(self._eol)
+
+        # Move whatever follows the last complete line to the start of the buffer
+        if start:
+            self._buf[: self._pos - start] = self._view[start : self._pos]
+            self._pos -= start
+
+        if self._pos == len(self._buf):
+            logger.warning("Response exceeds the receive buffer, closing connection")
+            self._transport.close()
+
+        if self._lines:
+            self._wake_waiter()
+
+    def eof_received(self) -> bool | None:
+        return None
+
+    def connection_lost(self, exc: Exception | None) -> None:
+        self._closed = True
+        self._wake_waiter()
+
+        if self._on_connection_lost is not None:
+            self._on_connection_lost(self)
+
+    def _wake_waiter(self) -> None:
+        if self._line_waiter is not None and not self._line_waiter.done():
+            self._line_waiter.set_result(None)
+
+    def write(self, data: bytes) -> None:
+        if self._closed or self._transport.is_closing():
+            raise ConnectionResetError("Connection was closed")
+
+        self._transport.write(data)
+
+    async def read_line(self) -> bytes:
+        while not self._lines:
+            if self._closed:
+                raise ConnectionResetError("Connection was closed")
+
+            self._line_waiter = asyncio.get_running_loop().create_future()
+            try:
+                await self._line_waiter
+            finally:
+                self._line_waiter = None
+
+        return self._lines.popleft()
 
 
 class ExtronDevice:
@@ -33,28 +130,33 @@ class ExtronDevice:
         self._host = host
         self._port = port
         self._password = password
-        self._reader: StreamReader | None = None
-        self._writer: StreamWriter | None = None
-        self._semaphore = asyncio.Semaphore()
+        self._transport: asyncio.Transport | None = None
+        self._protocol: ExtronSisProtocol | None = None
+        self._lock = asyncio.Lock()
+        self._reconnect_lock = asyncio.Lock()
+        self._reconnect_task: asyncio.Task | None = None
         self._connected = False
 
-    async def _read_until(self, phrase: str) -> str | None:
-        b = bytearray()
-
-        while not self._reader.at_eof():
-            byte = await self._reader.read(1)
-            b += byte
-
-            if b.endswith(phrase.encode()):
-                return b.decode()
-
-        return None
-
     async def attempt_login(self):
         return
 
     async def connect(self):
-        self._reader, self._writer = await asyncio.open_connection(self._host, self._port)
+        loop = asyncio.get_running_loop()
+        self._transport, self._protocol = await loop.create_connection(
+            lambda: ExtronSisProtocol(self._connection_lost), self._host, self._port
+        )
+
+        # Commands are only a few bytes long, make sure they're sent immediately instead of being held back by Nagle
+        sock = self._transport.get_extra_info("socket")
+        if sock is not None:
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+            # Detect connections silently dropped by NAT or firewalls while the device is idle
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+            if hasattr(socket, "TCP_KEEPIDLE"):
+                sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPIDLE, KEEPALIVE_IDLE)
+                sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPINTVL, KEEPALIVE_INTERVAL)
+                sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPCNT, KEEPALIVE_COUNT)
 
         try:
             await asyncio.wait_for(self.attempt_login(), timeout=5)
@@ -66,60 +168,154 @@ class ExtronDevice:
     async def disconnect(self):
         self._connected = False
 
+        # Abandon any background reconnect, unless this is being called by it
+        if self._reconnect_task is not None and self._reconnect_task is not asyncio.current_task():
+            self._reconnect_task.cancel()
+            self._reconnect_task = None
+
         # Ignore potential connection errors here, we're about to disconnect after all
         try:
-            self._writer.close()
-            await self._writer.wait_closed()
+            self._transport.close()
         except ConnectionError:
             pass
 
+    def _connection_lost(self, protocol: ExtronSisProtocol):
+        # Ignore connections we closed ourselves or that have already been replaced
+        if protocol is not self._protocol or not self._connected:
+            return
+
+        # The device hung up or keepalive gave up, reconnect before the next command needs the connection
+        self._connected = False
+        if self._reconnect_task is None:
+            self._reconnect_task = asyncio.create_task(self._reconnect_once())
+
     async def reconnect(self):
         await self.disconnect()
         await self.connect()
 
+    async def _reconnect_once(self):
+        try:
+            async with self._reconnect_lock:
+                # Another command may have already reconnected while we were waiting for the lock
+                if self._connected:
+                    return
+
+                logger.warning("Connection seems to be broken, will attempt to reconnect")
+                await self.reconnect()
+        except (OSError, AuthenticationError) as e:
+            logger.warning(f"Failed to reconnect to {self._host}:{self._port}: {e}")
+        finally:
+            # A disconnect may have replaced this task with a newer one, leave that one alone
+            if self._reconnect_task is asyncio.current_task():
+                self._reconnect_task = None
+
+    async def _wait_for_reconnect(self):
+        reconnect_task = self._reconnect_task
+        if reconnect_task is None:
+            return
+
+        # Shielded so a cancelled command doesn't abort the reconnect for everyone else
+        try:
+            await asyncio.shield(reconnect_task)
+        except asyncio.CancelledError:
+            if not reconnect_task.cancelled():
+                raise
+
+            raise RuntimeError("Reconnect was abandoned")
+        except Exception as e:
+            raise RuntimeError("Reconnect failed") from e
+
     def is_connected(self) -> bool:
         return self._connected
 
-    async def _run_command_internal(self, command: str):
-        async with self._semaphore:
-            self._writer.write(f"{command}\n".encode())
-            await self._writer.drain()
+    def is_reconnecting(self) -> bool:
+        return self._reconnect_task is not None
 
-            return await self._read_until("\r\n")
+    async def _run_command_internal(self, command: str) -> bytes:
+        async with self._lock:
+            self._protocol.write(_encode_command(command))
 
-    async def run_command(self, command: str) -> str:
-        try:
-            response = await asyncio.wait_for(self._run_command_internal(command), timeout=3)
+            return await self._protocol.read_line()
 
-            if response is None:
-                raise RuntimeError("Command failed")
+    async def _run_command_with_timeout(self, command: str) -> bytes:
+        async with asyncio.timeout(COMMAND_TIMEOUT):
+            return await self._run_command_internal(command)
 
-            if is_error_response(response):
-                # If response is E10, retry up to 5 times
-                if response.strip() == "E10":
-                    count = 0
-                    while count < 5:
-                        await sleep(3)
-                        response = await asyncio.wait_for(self._run_command_internal(command), timeout=3)
-                        if is_error_response(response) and response.strip() == "E10":
-                            count+=1
-                        else:
-                            break
-                    if is_error_response(response):
-                        raise ResponseError(f"Command failed with error code {response}")
-                else:
-                    raise ResponseError(f"Command failed with error code {response}")
+    async def _retry_with_backoff(
+        self,
+        coro_factory: Callable[[], Awaitable[bytes]],
+        retriable: frozenset[bytes] = RETRIABLE_ERRORS,
+        attempts: int = 5,
+        response: bytes | None = None,
+    ) -> bytes:
+        # The first response may already be known, e.g. when it was part of a pipelined batch
+        if response is None:
+            response = await coro_factory()
 
-            return response.strip()
+        # Retry transient error responses (e.g. E10) with capped exponential backoff
+        for attempt in range(attempts):
+            if response.strip() not in retriable:
+                break
+
+            await sleep(backoff_delay(attempt))
+            response = await coro_factory()
+
+        return response
+
+    async def _run_commands_internal(self, commands: list[str]) -> list[bytes]:
+        async with self._lock:
+            # SIS is line-oriented, so all commands can be written before reading the responses back
+            self._protocol.write(b"".join(_encode_command(command) for command in commands))
+
+            return [await self._protocol.read_line() for _ in commands]
+
+    @asynccontextmanager
+    async def _handle_command_errors(self):
+        try:
+            await self._wait_for_reconnect()
+            yield
         except TimeoutError:
+            # Late replies would be read as responses to later commands, reconnect to resync the stream
+            self._connected = False
             raise RuntimeError("Command timed out")
         except (ConnectionResetError, BrokenPipeError):
             self._connected = False
             raise RuntimeError("Connection was reset")
         finally:
-            if not self._connected:
-                logger.warning("Connection seems to be broken, will attempt to reconnect")
-                await self.reconnect()
+            # Reconnect in the background so the caller doesn't wait for it
+            if not self._connected and self._reconnect_task is None:
+                self._reconnect_task = asyncio.create_task(self._reconnect_once())
+
+    async def run_command_bytes(self, command: str) -> bytes:
+        async with self._handle_command_errors():
+            response = await self._retry_with_backoff(lambda: self._run_command_with_timeout(command))
+
+            if is_error_response(response):
+                raise ResponseError(f"Command failed with error code {response.decode()}")
+
+            return response.strip()
+
+    async def run_command(self, command: str) -> str:
+        return (await self.run_command_bytes(command)).decode()
+
+    async def run_commands_bytes(self, commands: list[str]) -> list[bytes]:
+        async with self._handle_command_errors():
+            async with asyncio.timeout(COMMAND_TIMEOUT):
+                responses = await self._run_commands_internal(commands)
+
+            for i, command in enumerate(commands):
+                # Retry transient errors individually, the rest of the batch is still valid
+                responses[i] = await self._retry_with_backoff(
+                    lambda c=command: self._run_command_with_timeout(c), response=responses[i]
+                )
+
+                if is_error_response(responses[i]):
+                    raise ResponseError(f"Command failed with error code {responses[i].decode()}")
+
+            return [response.strip() for response in responses]
+
+    async def run_commands(self, commands: list[str]) -> list[str]:
+        return [response.decode() for response in await self.run_commands_bytes(commands)]
 
     async def query_model_name(self):
         return await self.run_command("1I")
@@ -134,56 +330,181 @@ class ExtronDevice:
         await self.run_command("\x1b" + "1BOOT")
 
 
+class ExtronDevicePool:
+    def __init__(self, host: str, port: int, password: str, min_size: int = 1, max_size: int = 2) -> None:
+        self._host = host
+        self._port = port
+        self._password = password
+        self._min_size = min_size
+        self._idle: list[ExtronDevice] = []
+        self._in_use: set[ExtronDevice] = set()
+        self._semaphore = asyncio.Semaphore(max_size)
+        self._heartbeat_task: asyncio.Task | None = None
+        self._closed = False
+
+    async def _open_device(self) -> ExtronDevice:
+        device = ExtronDevice(self._host, self._port, self._password)
+        await device.connect()
+
+        return device
+
+    async def _heartbeat(self):
+        while True:
+            await sleep(HEARTBEAT_INTERVAL)
+
+            # Exercise every idle connection so a broken one gets reconnected here rather than on the next update,
+            # acquire() hands them out in turn and opens a fresh one if there are none left
+            for _ in range(max(len(self._idle), 1)):
+                try:
+                    async with self.acquire() as device:
+                        await device.query_firmware_version()
+                except Exception as e:
+                    # Keep the heartbeat alive whatever goes wrong, the next one may well succeed
+                    logger.warning(f"Heartbeat to {self._host}:{self._port} failed: {e!r}")
+
+    async def open(self):
+        while len(self._idle) < self._min_size:
+            self._idle.append(await self._open_device())
+
+    def start_heartbeat(self):
+        if self._heartbeat_task is None:
+            self._heartbeat_task = asyncio.create_task(self._heartbeat())
+
+    async def close(self):
+        # Devices that are checked out get disconnected when they're released
+        self._closed = True
+
+        if self._heartbeat_task is not None:
+            self._heartbeat_task.cancel()
+            self._heartbeat_task = None
+
+        while self._idle:
+            await self._idle.pop().disconnect()
+
+    def is_connected(self) -> bool:
+        return any(device.is_connected() for device in [*self._idle, *self._in_use])
+
+    @staticmethod
+    def _is_usable(device: ExtronDevice) -> bool:
+        return device.is_connected() or device.is_reconnecting()
+
+    @asynccontextmanager
+    async def acquire(self) -> AsyncIterator[ExtronDevice]:
+        async with self._semaphore:
+            # Take the least recently used connection so all of them get exercised
+            device = self._idle.pop(0) if self._idle else None
+
+            # Evict broken connections and open a fresh one in their place
+            if device is None or not self._is_usable(device):
+                if device is not None:
+                    logger.warning(f"Evicting broken connection to {self._host}:{self._port}")
+                    await device.disconnect()
+
+                device = await self._open_device()
+
+            self._in_use.add(device)
+
+            try:
+                yield device
+            finally:
+                self._in_use.discard(device)
+
+                if self._is_usable(device) and not self._closed:
+                    self._idle.append(device)
+                else:
+                    await device.disconnect()
+
+
+@dataclass
+class SurroundSoundProcessorStatus:
+    input: int
+    muted: bool
+    volume: int
+    temperature: int
+
+
+@dataclass
+class HDMISwitcherStatus:
+    input: int
+
+
 class SurroundSoundProcessor:
-    def __init__(self, device: ExtronDevice) -> None:
-        self._device = device
+    def __init__(self, pool: ExtronDevicePool) -> None:
+        self._pool = pool
 
-    def get_device(self) -> ExtronDevice:
-        return self._device
+    def get_pool(self) -> ExtronDevicePool:
+        return self._pool
 
     async def view_input(self) -> int:
-        return int((await self._device.run_command("$"))[3:])
+        async with self._pool.acquire() as device:
+            return int((await device.run_command_bytes("$"))[3:])
 
     async def select_input(self, input: int):
-        await self._device.run_command(f"{str(input)}$")
+        async with self._pool.acquire() as device:
+            await device.run_command(f"{str(input)}$")
+
+    async def get_status(self) -> SurroundSoundProcessorStatus:
+        async with self._pool.acquire() as device:
+            input, muted, volume, temperature = await device.run_commands_bytes(["$", "Z", "V", "20S"])
+
+        return SurroundSoundProcessorStatus(
+            input=int(input[3:]), muted=muted[3:4] == b"1", volume=int(volume[3:]), temperature=int(temperature[6:])
+        )
 
     async def mute(self):
-        await self._device.run_command("1Z")
+        async with self._pool.acquire() as device:
+            await device.run_command("1Z")
 
     async def unmute(self):
-        await self._device.run_command("0Z")
+        async with self._pool.acquire() as device:
+            await device.run_command("0Z")
 
     async def is_muted(self) -> bool:
-        is_muted = await self._device.run_command("Z")
-        return is_muted == "Amt1"
+        async with self._pool.acquire() as device:
+            is_muted = await device.run_command_bytes("Z")
+
+        # Mute responses are of the form "Amt0" or "Amt1"
+        return is_muted[3:4] == b"1"
 
     async def get_volume_level(self):
-        volume = await self._device.run_command("V")
+        async with self._pool.acquire() as device:
+            volume = await device.run_command_bytes("V")
+
         return int(volume[3:])
 
     async def set_volume_level(self, level: int):
-        await self._device.run_command(f"{level}V")
+        async with self._pool.acquire() as device:
+            await device.run_command(f"{level}V")
 
     async def increment_volume(self):
-        await self._device.run_command("+V")
+        async with self._pool.acquire() as device:
+            await device.run_command("+V")
 
     async def decrement_volume(self):
-        await self._device.run_command("-V")
+        async with self._pool.acquire() as device:
+            await device.run_command("-V")
 
     async def get_temperature(self) -> int:
-        temperature = await self._device.run_command("20S")
+        async with self._pool.acquire() as device:
+            temperature = await device.run_command_bytes("20S")
+
         return int(temperature[6:])
 
 
 class HDMISwitcher:
-    def __init__(self, device: ExtronDevice) -> None:
-        self._device = device
+    def __init__(self, pool: ExtronDevicePool) -> None:
+        self._pool = pool
 
-    def get_device(self) -> ExtronDevice:
-        return self._device
+    def get_pool(self) -> ExtronDevicePool:
+        return self._pool
 
     async def view_input(self) -> int:
-        return int(await self._device.run_command("!"))
+        async with self._pool.acquire() as device:
+            return int(await device.run_command_bytes("!"))
 
     async def select_input(self, input: int):
-        await self._device.run_command(f"{str(input)}!")
+        async with self._pool.acquire() as device:
+            await device.run_command(f"{str(input)}!")
+
+    async def get_status(self) -> HDMISwitcherStatus:
+        return HDMISwitcherStatus(input=await self.view_input())
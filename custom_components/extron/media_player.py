@@ -1,46 +1,56 @@
 import logging
 
-from bidict import bidict
 from homeassistant.components.media_player import MediaPlayerEntity, MediaPlayerEntityFeature, MediaPlayerState
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.helpers.entity import DeviceInfo
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
 from custom_components.extron import DeviceInformation, ExtronConfigEntryRuntimeData
 from custom_components.extron.const import CONF_DEVICE_TYPE
-from custom_components.extron.extron import DeviceType, ExtronDevice, HDMISwitcher, SurroundSoundProcessor
+from custom_components.extron.coordinator import ExtronDataUpdateCoordinator
+from custom_components.extron.extron import DeviceType
 
 logger = logging.getLogger(__name__)
 
+HDMI_SWITCHER_NUM_SOURCES = {"SW2": 2, "SW4": 4, "SW6": 6}
 
-def make_source_bidict(num_sources: int, input_names: list[str]) -> bidict:
+
+def make_source_maps(num_sources: int, input_names: list[str]) -> tuple[dict[int, str], dict[str, int]]:
     # Use user-defined input name for the source when available
-    return bidict({i + 1: input_names[i] if i < len(input_names) else str(i + 1) for i in range(num_sources)})
+    source_to_name = {i + 1: input_names[i] if i < len(input_names) else str(i + 1) for i in range(num_sources)}
+    name_to_source = {name: source for source, name in source_to_name.items()}
+
+    return source_to_name, name_to_source
 
 
 async def async_setup_entry(hass, entry: ConfigEntry, async_add_entities):
     # Extract stored runtime data from the entry
     runtime_data: ExtronConfigEntryRuntimeData = entry.runtime_data
-    device = runtime_data.device
+    coordinator = runtime_data.coordinator
     device_information = runtime_data.device_information
     input_names = runtime_data.input_names
 
     # Add entities
     if entry.data[CONF_DEVICE_TYPE] == DeviceType.SURROUND_SOUND_PROCESSOR.value:
-        ssp = SurroundSoundProcessor(device)
-        async_add_entities([ExtronSurroundSoundProcessor(ssp, device_information, input_names)])
+        async_add_entities([ExtronSurroundSoundProcessor(coordinator, device_information, input_names)])
     elif entry.data[CONF_DEVICE_TYPE] == DeviceType.HDMI_SWITCHER.value:
-        hdmi_switcher = HDMISwitcher(device)
-        async_add_entities([ExtronHDMISwitcher(hdmi_switcher, device_information, input_names)])
+        async_add_entities([ExtronHDMISwitcher(coordinator, device_information, input_names)])
 
 
-class AbstractExtronMediaPlayerEntity(MediaPlayerEntity):
-    def __init__(self, device: ExtronDevice, device_information: DeviceInformation, input_names: list[str]) -> None:
-        self._device = device
+class AbstractExtronMediaPlayerEntity(CoordinatorEntity[ExtronDataUpdateCoordinator], MediaPlayerEntity):
+    def __init__(
+        self, coordinator: ExtronDataUpdateCoordinator, device_information: DeviceInformation, input_names: list[str]
+    ) -> None:
+        super().__init__(coordinator)
+        self._pool = coordinator.get_device().get_pool()
         self._device_information = device_information
         self._input_names = input_names
         self._device_class = "receiver"
         self._state = MediaPlayerState.PLAYING
 
+        self._attr_unique_id = f"extron_{self.get_device_type().value}_media_player"
+        self._attr_name = f"Extron {device_information.model_name} media player"
+        self._attr_device_info = device_information.device_info
+
     def get_device_type(self):
         return DeviceType.UNKNOWN
 
@@ -48,37 +58,28 @@ class AbstractExtronMediaPlayerEntity(MediaPlayerEntity):
     def device_class(self):
         return self._device_class
 
-    @property
-    def unique_id(self) -> str | None:
-        device_type = self.get_device_type()
-        return f"extron_{device_type.value}_media_player"
-
     @property
     def state(self):
         return self._state
 
     @property
     def available(self) -> bool:
-        return self._device.is_connected()
+        return super().available and self._pool.is_connected()
 
     @property
-    def device_info(self) -> DeviceInfo:
-        return self._device_information.device_info
-
-    @property
-    def name(self):
-        return f"Extron {self._device_information.model_name} media player"
+    def source(self):
+        return self._source_to_name.get(self.coordinator.data.input)
 
 
 class ExtronSurroundSoundProcessor(AbstractExtronMediaPlayerEntity):
-    def __init__(self, ssp: SurroundSoundProcessor, device_information: DeviceInformation, input_names: list[str]):
-        super().__init__(ssp.get_device(), device_information, input_names)
-        self._ssp = ssp
+    def __init__(
+        self, coordinator: ExtronDataUpdateCoordinator, device_information: DeviceInformation, input_names: list[str]
+    ) -> None:
+        super().__init__(coordinator, device_information, input_names)
+        self._ssp = coordinator.get_device()
 
-        self._source = None
-        self._source_bidict = self.create_source_bidict()
-        self._volume = None
-        self._muted = False
+        self._source_to_name, self._name_to_source = self.create_source_maps()
+        self._attr_source_list = tuple(self._source_to_name.values())
 
     _attr_supported_features = (
         MediaPlayerEntityFeature.SELECT_SOURCE
@@ -90,15 +91,9 @@ class ExtronSurroundSoundProcessor(AbstractExtronMediaPlayerEntity):
     def get_device_type(self):
         return DeviceType.SURROUND_SOUND_PROCESSOR
 
-    async def async_update(self):
-        self._source = self._source_bidict.get(await self._ssp.view_input())
-        self._muted = await self._ssp.is_muted()
-        volume = await self._ssp.get_volume_level()
-        self._volume = volume / 100
-
     @property
     def volume_level(self):
-        return self._volume
+        return self.coordinator.data.volume / 100
 
     @property
     def volume_step(self):
@@ -106,78 +101,55 @@ class ExtronSurroundSoundProcessor(AbstractExtronMediaPlayerEntity):
 
     @property
     def is_volume_muted(self):
-        return self._muted
+        return self.coordinator.data.muted
 
-    @property
-    def source(self):
-        return self._source
-
-    @property
-    def source_list(self):
-        return list(self._source_bidict.values())
-
-    def create_source_bidict(self) -> bidict:
-        return make_source_bidict(5, self._input_names)
+    def create_source_maps(self) -> tuple[dict[int, str], dict[str, int]]:
+        return make_source_maps(5, self._input_names)
 
     async def async_select_source(self, source):
-        await self._ssp.select_input(self._source_bidict.inverse.get(source))
-        self._source = source
+        await self._ssp.select_input(self._name_to_source[source])
+        await self.coordinator.async_request_refresh()
 
     async def async_mute_volume(self, mute: bool) -> None:
         await self._ssp.mute() if mute else await self._ssp.unmute()
+        await self.coordinator.async_request_refresh()
 
     async def async_set_volume_level(self, volume: float) -> None:
         await self._ssp.set_volume_level(int(volume * 100))
+        await self.coordinator.async_request_refresh()
 
     async def async_volume_up(self) -> None:
         await self._ssp.increment_volume()
+        await self.coordinator.async_request_refresh()
 
     async def async_volume_down(self) -> None:
         await self._ssp.decrement_volume()
+        await self.coordinator.async_request_refresh()
 
 
 class ExtronHDMISwitcher(AbstractExtronMediaPlayerEntity):
     def __init__(
-        self, hdmi_switcher: HDMISwitcher, device_information: DeviceInformation, input_names: list[str]
+        self, coordinator: ExtronDataUpdateCoordinator, device_information: DeviceInformation, input_names: list[str]
     ) -> None:
-        super().__init__(hdmi_switcher.get_device(), device_information, input_names)
-        self._hdmi_switcher = hdmi_switcher
+        super().__init__(coordinator, device_information, input_names)
+        self._hdmi_switcher = coordinator.get_device()
 
         self._state = MediaPlayerState.PLAYING
-        self._source = None
-        self._source_bidict = self.create_source_bidict()
+        self._source_to_name, self._name_to_source = self.create_source_maps()
+        self._attr_source_list = tuple(self._source_to_name.values())
 
     _attr_supported_features = MediaPlayerEntityFeature.SELECT_SOURCE
 
     def get_device_type(self):
         return DeviceType.HDMI_SWITCHER
 
-    async def async_update(self):
-        self._source = self._source_bidict.get(await self._hdmi_switcher.view_input())
-
-    @property
-    def source(self):
-        return self._source
-
-    @property
-    def source_list(self):
-        return list(self._source_bidict.values())
-
-    def create_source_bidict(self) -> bidict:
-        model_name = self._device_information.model_name
-        sw = model_name.split(" ")[0]
-
-        if sw == "SW2":
-            num_sources = 2
-        elif sw == "SW4":
-            num_sources = 4
-        elif sw == "SW6":
-            num_sources = 6
-        else:
-            num_sources = 8
+    def create_source_maps(self) -> tuple[dict[int, str], dict[str, int]]:
+        # The model name starts with the switcher size, e.g. "SW4 HD 4K"
+        sw = self._device_information.model_name.split(" ", 1)[0]
+        num_sources = HDMI_SWITCHER_NUM_SOURCES.get(sw, 8)
 
-        return make_source_bidict(num_sources, self._input_names)
+        return make_source_maps(num_sources, self._input_names)
 
     async def async_select_source(self, source: str):
-        await self._hdmi_switcher.select_input(self._source_bidict.inverse.get(source))
-        self._source = source
+        await self._hdmi_switcher.select_input(self._name_to_source[source])
+        await self.coordinator.async_request_refresh()
@@ -0,0 +1,68 @@
+import unittest
+
+from contextlib import asynccontextmanager
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.update_coordinator import UpdateFailed
+
+from custom_components.extron.coordinator import ExtronDataUpdateCoordinator
+from custom_components.extron.extron import (
+    HDMISwitcher,
+    HDMISwitcherStatus,
+    ResponseError,
+    SurroundSoundProcessor,
+    SurroundSoundProcessorStatus,
+)
+
+
+def make_pool(device: MagicMock) -> MagicMock:
+    @asynccontextmanager
+    async def acquire():
+        yield device
+
+    pool = MagicMock()
+    pool.acquire = acquire
+
+    return pool
+
+
+class ExtronDataUpdateCoordinatorTestCase(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.hass = HomeAssistant("/tmp")
+        self.device = MagicMock()
+        self.device.run_commands_bytes = AsyncMock(return_value=[b"Inp3", b"Amt1", b"Vol42", b"Tmp   37"])
+        self.device.run_command_bytes = AsyncMock(return_value=b"2")
+        self.pool = make_pool(self.device)
+
+    async def test_surround_sound_processor_status(self):
+        coordinator = ExtronDataUpdateCoordinator(self.hass, SurroundSoundProcessor(self.pool))
+
+        status = await coordinator._async_update_data()
+
+        self.device.run_commands_bytes.assert_awaited_once_with(["$", "Z", "V", "20S"])
+        self.assertEqual(SurroundSoundProcessorStatus(input=3, muted=True, volume=42, temperature=37), status)
+
+    async def test_hdmi_switcher_status(self):
+        coordinator = ExtronDataUpdateCoordinator(self.hass, HDMISwitcher(self.pool))
+
+        self.assertEqual(HDMISwitcherStatus(input=2), await coordinator._async_update_data())
+
+    async def test_errors_are_update_failures(self):
+        coordinator = ExtronDataUpdateCoordinator(self.hass, SurroundSoundProcessor(self.pool))
+
+        for error in [RuntimeError("Command timed out"), ResponseError("E13"), OSError(), ValueError()]:
+            with self.subTest(error=error), patch.object(SurroundSoundProcessor, "get_status", side_effect=error):
+                with self.assertRaises(UpdateFailed):
+                    await coordinator._async_update_data()
+
+    async def test_garbled_reply_is_update_failure(self):
+        self.device.run_commands_bytes.return_value = [b"Inp3", b"Amt1", b"garbled", b"Tmp   37"]
+        coordinator = ExtronDataUpdateCoordinator(self.hass, SurroundSoundProcessor(self.pool))
+
+        with self.assertRaises(UpdateFailed):
+            await coordinator._async_update_data()
+
+
+if __name__ == "__main__":
+    unittest.main()
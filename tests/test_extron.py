@@ -1,6 +1,82 @@
+import asyncio
 import unittest
 
-from custom_components.extron.extron import is_error_response
+from unittest.mock import AsyncMock, patch
+
+from custom_components.extron.extron import (
+    RETRY_JITTER,
+    RETRY_MAX_DELAY,
+    AuthenticationError,
+    ExtronDevice,
+    ExtronDevicePool,
+    ExtronSisProtocol,
+    ResponseError,
+    backoff_delay,
+    is_error_response,
+)
+
+
+class FakeSisServer:
+    """Minimal SIS server that answers every command with a fixed response."""
+
+    def __init__(self, responses: dict[str, str] | None = None) -> None:
+        self.responses = responses or {}
+        self.connections = 0
+        self.drop_next = False
+        self.busy: dict[str, int] = {}
+        self.delays: dict[str, float] = {}
+        self._server: asyncio.Server | None = None
+        self._handlers: set[asyncio.Task] = set()
+        self._writers: set[asyncio.StreamWriter] = set()
+
+    async def start(self) -> int:
+        self._server = await asyncio.start_server(self._handle, "127.0.0.1", 0)
+        return self._server.sockets[0].getsockname()[1]
+
+    def hang_up(self):
+        # Drop every open connection, as a rebooting device would
+        for writer in self._writers:
+            writer.close()
+
+    def stop_listening(self):
+        self._server.close()
+
+    async def stop(self):
+        self._server.close()
+
+        # Handlers finish once the clients have hung up
+        if self._handlers:
+            await asyncio.wait(self._handlers, timeout=1)
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.connections += 1
+        self._handlers.add(asyncio.current_task())
+        self._writers.add(writer)
+
+        try:
+            while line := await reader.readline():
+                # Hang up instead of answering, as a device that dropped the connection would
+                if self.drop_next:
+                    self.drop_next = False
+                    break
+
+                command = line.decode().strip()
+                if command in self.delays:
+                    await asyncio.sleep(self.delays.pop(command))
+
+                # Answer E10 while the command is still marked as busy
+                if self.busy.get(command, 0) > 0:
+                    self.busy[command] -= 1
+                    response = "E10"
+                else:
+                    response = self.responses.get(command, command)
+
+                writer.write(f"{response}\r\n".encode())
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
 
 
 class ExtronTestCase(unittest.TestCase):
@@ -9,6 +85,287 @@ class ExtronTestCase(unittest.TestCase):
         self.assertTrue(is_error_response("E74\n"))
         self.assertTrue(is_error_response("E23\r\n  "))
         self.assertFalse(is_error_response("0"))
+        self.assertFalse(is_error_response("E1"))
+        self.assertFalse(is_error_response("Amt1"))
+        self.assertTrue(is_error_response(b"E10"))
+        self.assertFalse(is_error_response(b"Amt1"))
+
+    def test_backoff_delay(self):
+        self.assertGreaterEqual(backoff_delay(0), 0.1)
+        self.assertLessEqual(backoff_delay(0), 0.1 * (1 + RETRY_JITTER))
+        self.assertGreater(backoff_delay(3), backoff_delay(0))
+        self.assertLessEqual(backoff_delay(100), RETRY_MAX_DELAY * (1 + RETRY_JITTER))
+
+
+class FakeTransport:
+    def __init__(self) -> None:
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+    def is_closing(self) -> bool:
+        return self.closed
+
+
+class ExtronSisProtocolTestCase(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.transport = FakeTransport()
+        self.protocol = ExtronSisProtocol()
+        self.protocol.connection_made(self.transport)
+
+    def feed(self, data: bytes):
+        buffer = self.protocol.get_buffer(len(data))
+        buffer[: len(data)] = data
+        self.protocol.buffer_updated(len(data))
+
+    async def test_line_split_across_chunks(self):
+        self.feed(b"Vol")
+        self.feed(b"42\r\n")
+        self.assertEqual(b"Vol42", await self.protocol.read_line())
+
+    async def test_two_lines_in_one_chunk(self):
+        self.feed(b"Inp3\r\nAmt1\r\n")
+        self.assertEqual(b"Inp3", await self.protocol.read_line())
+        self.assertEqual(b"Amt1", await self.protocol.read_line())
+
+    async def test_chunk_ending_after_carriage_return(self):
+        self.feed(b"Amt0\r")
+        self.feed(b"\nVol1")
+        self.feed(b"0\r\n")
+        self.assertEqual(b"Amt0", await self.protocol.read_line())
+        self.assertEqual(b"Vol10", await self.protocol.read_line())
+
+    async def test_waiter_is_woken_by_later_chunk(self):
+        read = asyncio.create_task(self.protocol.read_line())
+        await asyncio.sleep(0)
+        self.feed(b"1.23\r\n")
+        self.assertEqual(b"1.23", await read)
+
+    async def test_overflow_closes_transport(self):
+        self.feed(b"x" * len(self.protocol.get_buffer(0)))
+        self.assertTrue(self.transport.closed)
+
+        self.protocol.connection_lost(None)
+        with self.assertRaises(ConnectionResetError):
+            await self.protocol.read_line()
+
+
+class ExtronDevicePoolTestCase(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.server = FakeSisServer({"Q": "1.23"})
+        port = await self.server.start()
+        self.pool = ExtronDevicePool("127.0.0.1", port, "", min_size=1, max_size=2)
+        await self.pool.open()
+
+    async def asyncTearDown(self):
+        await self.pool.close()
+        await self.server.stop()
+
+    async def test_evicts_broken_idle_device(self):
+        async with self.pool.acquire() as device:
+            await device.disconnect()
+
+        async with self.pool.acquire() as replacement:
+            self.assertIsNot(device, replacement)
+            self.assertEqual("1.23", await replacement.query_firmware_version())
+
+        self.assertEqual(2, self.server.connections)
+
+    async def test_max_size_bound(self):
+        async with self.pool.acquire() as first, self.pool.acquire() as second:
+            self.assertIsNot(first, second)
+
+            # A third acquire has to wait until one of the devices is released
+            with self.assertRaises(TimeoutError):
+                async with asyncio.timeout(0.1), self.pool.acquire():
+                    pass
+
+        self.assertEqual(2, self.server.connections)
+
+    async def test_heartbeat_survives_errors(self):
+        with (
+            patch("custom_components.extron.extron.HEARTBEAT_INTERVAL", 0.01),
+            patch.object(ExtronDevicePool, "_open_device", side_effect=AuthenticationError()),
+        ):
+            async with self.pool.acquire() as device:
+                await device.disconnect()
+
+            with self.assertLogs("custom_components.extron.extron", "WARNING") as logs:
+                self.pool.start_heartbeat()
+                await asyncio.sleep(0.05)
+
+        self.assertTrue(any("AuthenticationError" in line for line in logs.output))
+        self.assertFalse(self.pool._heartbeat_task.done())
+
+    async def test_peer_hanging_up_on_idle_device(self):
+        async with self.pool.acquire() as device:
+            pass
+
+        self.server.hang_up()
+        await asyncio.sleep(0.05)
+
+        # The device notices the hang-up by itself and reconnects before the next command
+        self.assertEqual(2, self.server.connections)
+        self.assertTrue(device.is_connected())
+
+        async with self.pool.acquire() as same_device:
+            self.assertIs(device, same_device)
+            self.assertEqual("1.23", await same_device.query_firmware_version())
+
+    async def test_heartbeat_exercises_every_idle_device(self):
+        async with self.pool.acquire(), self.pool.acquire():
+            pass
+
+        exercised = set()
+
+        async def query_firmware_version(device: ExtronDevice) -> str:
+            exercised.add(device)
+            return "1.23"
+
+        with (
+            patch("custom_components.extron.extron.HEARTBEAT_INTERVAL", 0.01),
+            patch.object(ExtronDevice, "query_firmware_version", autospec=True, side_effect=query_firmware_version),
+        ):
+            self.pool.start_heartbeat()
+
+            async with asyncio.timeout(1):
+                while len(exercised) < 2:
+                    await asyncio.sleep(0.01)
+
+    async def test_close_disconnects_checked_out_device(self):
+        async with self.pool.acquire() as device:
+            await self.pool.close()
+            self.assertTrue(device.is_connected())
+
+        self.assertFalse(device.is_connected())
+        self.assertFalse(self.pool.is_connected())
+
+
+class ExtronDeviceRunCommandsTestCase(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.server = FakeSisServer({"$": "Inp3", "Z": "Amt1", "V": "Vol42"})
+        self.device = ExtronDevice("127.0.0.1", await self.server.start(), "")
+        await self.device.connect()
+
+    async def asyncTearDown(self):
+        await self.device.disconnect()
+        await self.server.stop()
+
+    async def test_replies_in_command_order(self):
+        self.assertEqual([b"Inp3", b"Amt1", b"Vol42"], await self.device.run_commands_bytes(["$", "Z", "V"]))
+        self.assertEqual(["Vol42", "Inp3"], await self.device.run_commands(["V", "$"]))
+
+    async def test_retries_busy_command_with_backoff(self):
+        self.server.busy["Z"] = 2
+
+        with patch("custom_components.extron.extron.sleep", new_callable=AsyncMock) as sleep:
+            responses = await self.device.run_commands_bytes(["$", "Z", "V"])
+
+        self.assertEqual([b"Inp3", b"Amt1", b"Vol42"], responses)
+        # Every retry, including the first one, waits before resending
+        self.assertEqual(2, sleep.await_count)
+
+    async def test_raises_when_busy_never_clears(self):
+        self.server.busy["Z"] = 100
+
+        with patch("custom_components.extron.extron.sleep", new_callable=AsyncMock) as sleep:
+            with self.assertRaises(ResponseError):
+                await self.device.run_commands_bytes(["$", "Z", "V"])
+
+        self.assertEqual(5, sleep.await_count)
+        self.assertEqual(94, self.server.busy["Z"])
+
+    async def test_timeout_marks_device_disconnected(self):
+        self.server.delays["V"] = 0.2
+
+        with patch("custom_components.extron.extron.COMMAND_TIMEOUT", 0.1):
+            with self.assertRaises(RuntimeError):
+                await self.device.run_commands_bytes(["$", "Z", "V"])
+
+        self.assertFalse(self.device.is_connected())
+
+        # The late reply must not be mistaken for the answer to a later command
+        self.assertEqual([b"Inp3", b"Amt1"], await self.device.run_commands_bytes(["$", "Z"]))
+
+
+class ExtronDeviceReconnectTestCase(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.server = FakeSisServer({"Q": "1.23"})
+        self.device = ExtronDevice("127.0.0.1", await self.server.start(), "")
+        await self.device.connect()
+
+    async def asyncTearDown(self):
+        await self.device.disconnect()
+        await self.server.stop()
+
+    async def wait_for_reconnect(self):
+        while self.device.is_reconnecting():
+            await asyncio.sleep(0.01)
+
+    async def test_failing_command_raises_before_reconnecting(self):
+        self.server.drop_next = True
+
+        with self.assertRaises(RuntimeError):
+            await self.device.query_firmware_version()
+
+        # The reconnect runs in the background rather than inside the failing command
+        self.assertFalse(self.device.is_connected())
+        self.assertTrue(self.device.is_reconnecting())
+
+    async def test_next_command_awaits_reconnect(self):
+        self.server.drop_next = True
+
+        with self.assertRaises(RuntimeError):
+            await self.device.query_firmware_version()
+
+        self.assertEqual("1.23", await self.device.query_firmware_version())
+        self.assertTrue(self.device.is_connected())
+        self.assertEqual(2, self.server.connections)
+
+    async def test_cancelled_command_does_not_abort_reconnect(self):
+        self.server.drop_next = True
+
+        with self.assertRaises(RuntimeError):
+            await self.device.query_firmware_version()
+
+        command = asyncio.create_task(self.device.query_firmware_version())
+        await asyncio.sleep(0)
+        command.cancel()
+
+        await self.wait_for_reconnect()
+        self.assertTrue(self.device.is_connected())
+
+    async def test_failed_reconnect_leaves_device_evictable(self):
+        self.server.drop_next = True
+        self.server.stop_listening()
+
+        with self.assertRaises(RuntimeError):
+            await self.device.query_firmware_version()
+
+        await self.wait_for_reconnect()
+        self.assertFalse(self.device.is_connected())
+        self.assertFalse(ExtronDevicePool._is_usable(self.device))
+
+    async def test_abandoned_reconnect_keeps_newer_reconnect(self):
+        self.server.drop_next = True
+
+        # Hold the reconnect lock so the first reconnect is still pending when it gets abandoned
+        async with self.device._reconnect_lock:
+            with self.assertRaises(RuntimeError):
+                await self.device.query_firmware_version()
+
+            abandoned = self.device._reconnect_task
+            await asyncio.sleep(0)
+            await self.device.disconnect()
+            self.device._reconnect_task = asyncio.create_task(self.device._reconnect_once())
+
+        await asyncio.wait([abandoned])
+        self.assertTrue(abandoned.cancelled())
+        self.assertTrue(self.device.is_reconnecting())
+
+        await self.wait_for_reconnect()
+        self.assertTrue(self.device.is_connected())
 
 
 if __name__ == "__main__":
@@ -1,26 +1,28 @@
 from unittest import TestCase
 
-from custom_components.extron.media_player import make_source_bidict
+from custom_components.extron.media_player import make_source_maps
 
 
-class TestSourceBidict(TestCase):
-    def test_make_source_bidict(self):
+class TestSourceMaps(TestCase):
+    def test_make_source_maps(self):
         # No input names specified
-        bd = make_source_bidict(4, [])
-        self.assertEqual(4, len(bd.values()))
-        self.assertEqual("1", bd.get(1))
-        self.assertEqual("4", bd.get(4))
+        source_to_name, name_to_source = make_source_maps(4, [])
+        self.assertEqual(4, len(source_to_name.values()))
+        self.assertEqual("1", source_to_name.get(1))
+        self.assertEqual("4", source_to_name.get(4))
+        self.assertEqual(4, name_to_source.get("4"))
 
         # First two input names specified
-        bd = make_source_bidict(4, ["foo", "bar"])
-        self.assertEqual(4, len(bd.values()))
-        self.assertEqual("foo", bd.get(1))
-        self.assertEqual("bar", bd.get(2))
-        self.assertEqual("3", bd.get(3))
-        self.assertEqual("4", bd.get(4))
+        source_to_name, name_to_source = make_source_maps(4, ["foo", "bar"])
+        self.assertEqual(4, len(source_to_name.values()))
+        self.assertEqual("foo", source_to_name.get(1))
+        self.assertEqual("bar", source_to_name.get(2))
+        self.assertEqual(2, name_to_source.get("bar"))
+        self.assertEqual("3", source_to_name.get(3))
+        self.assertEqual("4", source_to_name.get(4))
 
         # Define one more input name than there are sources
-        bd = make_source_bidict(2, ["foo", "bar", "baz"])
-        self.assertEqual(2, len(bd.values()))
-        self.assertEqual("foo", bd.get(1))
-        self.assertEqual("bar", bd.get(2))
+        source_to_name, name_to_source = make_source_maps(2, ["foo", "bar", "baz"])
+        self.assertEqual(2, len(source_to_name.values()))
+        self.assertEqual("foo", source_to_name.get(1))
+        self.assertEqual("bar", source_to_name.get(2))